@@ -1,16 +1,25 @@
+import asyncio
+import functools
+import hashlib
 import os
 import io 
+import re
+import time
+
+from collections import OrderedDict
+from pathlib import Path
 
-from contextlib import ExitStack
 from datetime import date
 from models import SessionLocal, Message
+from sqlalchemy import and_, or_, select
 
 from langchain.chat_models import init_chat_model
 from langchain_tavily import TavilySearch
-from langgraph.checkpoint.postgres import PostgresSaver
+from langgraph.checkpoint.postgres.aio import AsyncPostgresSaver
 from langgraph.graph import StateGraph, START, END
 from twilio.rest import Client
 from openai import AsyncOpenAI
+from psycopg_pool import AsyncConnectionPool
 
 from assistant.state import State
 from assistant.tool_calls import BasicToolNode
@@ -36,12 +45,91 @@ connection_string = f"postgresql://{_db_user}:{_db_pass}@{_db_host}:{_db_port}/{
 # Also prepare a DSN fallback (space separated) if URL fails
 dsn_fallback = f"host={_db_host} port={_db_port} dbname={_db_name} user={_db_user} password={_db_pass}"
 
+# Assistant instructions, read once at import and resolved relative to the backend dir (not the CWD)
+_PROMPT_PATH = Path(__file__).resolve().parent.parent / "prompts" / "_evo_001"
+_ASSISTANT_INSTRUCTIONS = _PROMPT_PATH.read_text(encoding="utf-8")
+
+# Whisper works on 16 kHz mono internally; anything richer is wasted upload bytes
+_WHISPER_SAMPLE_RATE = 16000
+
+def _prepare_audio_for_whisper(audio_bytes: bytes, filename: str) -> tuple[bytes, str]:
+    """Downmix/resample non-Opus audio to 16 kHz mono Opus before upload.
+
+    WhatsApp voice notes already arrive as compact OGG/Opus and are passed through untouched
+    (decoding them to PCM WAV would make the upload several times larger). Other formats are
+    re-encoded with ffmpeg via pydub; on any failure (including pydub/audioop or ffmpeg being
+    unavailable) the original bytes are returned.
+    """
+    if filename.lower().endswith((".ogg", ".opus")):
+        return audio_bytes, filename
+    try:
+        # Imported lazily: pydub needs audioop, which Python 3.13 removed
+        from pydub import AudioSegment
+
+        segment = AudioSegment.from_file(io.BytesIO(audio_bytes))
+        segment = segment.set_channels(1).set_frame_rate(_WHISPER_SAMPLE_RATE)
+        out = io.BytesIO()
+        segment.export(out, format="ogg", codec="libopus", bitrate="24k")
+        transcoded = out.getvalue()
+    except Exception as e:
+        print(f"[transcribe_audio] Transcoding skipped, sending original audio: {e}")
+        return audio_bytes, filename
+    if len(transcoded) >= len(audio_bytes):
+        return audio_bytes, filename
+    return transcoded, "voice.ogg"
+
+def _extract_text(content) -> str:
+    """Flatten message content (a string, or a list of Responses API content blocks) to text."""
+    if type(content) is str:
+        return content
+    parts = []
+    for part in content:
+        if type(part) is dict:
+            parts.append(part.get("text", ""))
+        elif type(part) is str:
+            parts.append(part)
+        else:
+            parts.append(getattr(part, "text", ""))
+    return "".join(parts)
+
+_today_cache: list = [None, None]
+
+def _today_iso() -> str:
+    """Today's date as ISO string, recomputed only when the date rolls over."""
+    d = date.today()
+    if _today_cache[0] != d:
+        _today_cache[:] = [d, d.isoformat()]
+    return _today_cache[1]
+
+# Shared Twilio client so its HTTP session (and keep-alive connections) is reused process-wide
+TWILIO_CLIENT = Client()
+
+@functools.lru_cache(maxsize=4)
+def _build_chat_model(model_name: str, temperature: float):
+    """Initialize (once per model/temperature) the underlying chat model."""
+    return init_chat_model(model_name, temperature=temperature, use_responses_api=True)
+
+# In-memory LRU of recent (sender, prompt) -> response pairs for repeated short messages
+_RESPONSE_CACHE_MAX_ENTRIES = 256
+# Cached replies were generated with the conversation and the date in context, so they go stale fast
+_RESPONSE_CACHE_TTL_SECONDS = 10 * 60
+
+# Only context-free greetings/thanks are served from cache. Anything else (confirmations like
+# "sí"/"ok", action verbs like "borralo"/"cancel it"/"movelo") depends on the conversation state
+# and must always run through the graph. Note that a cache hit skips graph.ainvoke, so that turn
+# is never added to the LangGraph checkpoint (it is only stored in the messages table).
+_CACHEABLE_PROMPT_RE = re.compile(
+    r"(hola|hi|hello|hey|buen[oa]s( d[ií]as| tardes| noches)?|"
+    r"gracias|muchas gracias|thanks|thank you|thx)[\s!.¡]*",
+    re.IGNORECASE,
+)
+
 class Assistant:
     """LangChain agent wrapper with Postgres-backed checkpointing.
 
-    IMPORTANT: PostgresSaver.from_conn_string returns a *context manager* that must be
-    entered to obtain the actual saver instance. Passing the raw context manager causes
-    errors like: '_GeneratorContextManager' object has no attribute 'get_next_version'.
+    Checkpoints go through an AsyncPostgresSaver backed by a long-lived AsyncConnectionPool,
+    so concurrent graph runs don't serialize on a single connection. The pool is opened in
+    `setup()` and released in `close()`; both must be awaited by the owner (the FastAPI lifespan).
     """
 
     def __init__(self):
@@ -51,12 +139,32 @@ class Assistant:
             get_calendar_events,
             delete_calendar_event,
         ]
-        self.agent = init_chat_model("gpt-4o-mini", temperature=0.5, use_responses_api=True).bind_tools(self.tools)
-        self.graph_builder = StateGraph(State)
+        self.agent = _build_chat_model("gpt-4o-mini", 0.5).bind_tools(self.tools)
         self.tool_node = BasicToolNode(tools=self.tools)
-        self.graph_builder.add_node("tools", self.tool_node)
 
-        self.graph_builder.add_conditional_edges(
+        self._pool: AsyncConnectionPool | None = None
+        self.memory: AsyncPostgresSaver | None = None
+        self.graph = None
+
+        # Concurrency gates for outbound OpenAI calls (chat graph runs / Whisper transcriptions)
+        self._chat_sem = asyncio.Semaphore(8)
+        self._stt_sem = asyncio.Semaphore(2)
+
+        self._response_cache: OrderedDict[bytes, tuple[float, str]] = OrderedDict()
+
+        self.twilio_client = TWILIO_CLIENT
+        # One OpenAI client (and its HTTP connection pool) for all transcriptions
+        self._openai = AsyncOpenAI(api_key=os.environ["OPENAI_API_KEY"])
+
+        self.assistant_instructions = _ASSISTANT_INSTRUCTIONS
+
+    def _build_graph(self, checkpointer: AsyncPostgresSaver):
+        """Build and compile the chat/tools graph against the given checkpointer."""
+        graph_builder = StateGraph(State)
+        graph_builder.add_node("chat", self.chat)
+        graph_builder.add_node("tools", self.tool_node)
+
+        graph_builder.add_conditional_edges(
             "chat",
             BasicToolNode.route_tools,
             # The following dictionary lets you tell the graph to interpret the condition's outputs as a specific node
@@ -66,81 +174,87 @@ class Assistant:
             # e.g., "tools": "my_tools"
             {"tools": "tools", END: END},
         )
-        self.graph_builder.add_edge("tools", "chat")
-        
-        self._exit_stack = ExitStack()
-        self.memory: PostgresSaver | None = None
+        graph_builder.add_edge("tools", "chat")
+        graph_builder.add_edge(START, "chat")
+        graph_builder.add_edge("chat", END)
+        return graph_builder.compile(checkpointer=checkpointer)
+
+    async def setup(self):
+        """Open the checkpointer connection pool and compile the graph.
+
+        Must be awaited once (e.g. from the FastAPI lifespan) before generating responses.
+        """
         last_err: Exception | None = None
 
         # Try URL form first, then DSN.
         for candidate in (connection_string, dsn_fallback):
+            pool = AsyncConnectionPool(
+                conninfo=candidate,
+                min_size=5,
+                max_size=20,
+                kwargs={"autocommit": True, "prepare_threshold": 0},
+                open=False,
+            )
             try:
-                cm = PostgresSaver.from_conn_string(candidate)
-                self.memory = self._exit_stack.enter_context(cm)
+                # Fail fast on a bad candidate instead of psycopg_pool's 30 s default
+                await pool.open(wait=True, timeout=5)
+                self._pool = pool
                 break
             except Exception as e:
                 last_err = e
-                print(f"[LangChain] Failed to init PostgresSaver with '{candidate}': {e}")
-        if self.memory is None:
+                await pool.close()
+                print(f"[LangChain] Failed to open connection pool with '{candidate}': {e}")
+        if self._pool is None:
             raise RuntimeError(
-                "Could not initialize PostgresSaver with either URL or DSN. "
+                "Could not initialize AsyncPostgresSaver with either URL or DSN. "
                 "Check DB credentials and network accessibility." 
                 + (f" Last error: {last_err}" if last_err else "")
             )
 
-        self.memory.setup()
-
-        self.twilio_client = Client()
-
-        # Load assistant instructions once during initialization
-        with open("./prompts/_evo_001", "r", encoding="utf-8") as fp:
-            self.assistant_instructions = fp.read()
+        self.memory = AsyncPostgresSaver(self._pool)
+        await self.memory.setup()
+        self.graph = self._build_graph(self.memory)
 
-        self.graph_builder.add_node("chat", self.chat)
-        self.graph_builder.add_edge(START, "chat")
-        self.graph_builder.add_edge("chat", END)
-        self.graph = self.graph_builder.compile(checkpointer=self.memory)
-
-    def chat(self, state: State):
+    async def chat(self, state: State):
         """Chat node that processes messages and generates responses."""
         return {
-            "messages": [self.agent.invoke(state["messages"])]
+            "messages": [await self.agent.ainvoke(state["messages"])]
         }
     
-    def close(self):
-        """Gracefully close the PostgresSaver context."""
+    async def close(self):
+        """Gracefully close the checkpointer connection pool and the OpenAI client."""
         try:
-            if hasattr(self, "_exit_stack") and self._exit_stack:
-                self._exit_stack.close()
+            if self._pool is not None:
+                await self._pool.close()
+                self._pool = None
         except Exception as e:
-            print(f"[LangChain] Error while closing checkpointer: {e}")
-
-    def __del__(self):  # best-effort cleanup
-        self.close()
+            print(f"[LangChain] Error while closing checkpointer pool: {e}")
+        await self._openai.close()
 
     def _load_conversation_history(self, from_number: str, to_number: str, limit: int = 20):
         """Load recent conversation history from database"""
+        # Get messages between these two numbers (both directions), selecting only the needed columns
+        stmt = (
+            select(Message.content, Message.message_type)
+            .where(or_(
+                and_(Message._from == from_number, Message._to == to_number),
+                and_(Message._from == to_number, Message._to == from_number),
+            ))
+            .order_by(Message.id.desc())
+            .limit(limit)
+        )
         db = SessionLocal()
         try:
-            # Get messages between these two numbers (both directions)
-            messages = db.query(Message).filter(
-                ((Message._from == from_number) & (Message._to == to_number)) |
-                ((Message._from == to_number) & (Message._to == from_number))
-            ).order_by(Message.id.desc()).limit(limit).all()
-            
-            # Reverse to get chronological order
-            messages.reverse()
-            
-            # Convert to LangChain message format
-            formatted_messages = []
-            for msg in messages:
-                role = "user" if msg.message_type == "user" else "assistant"
-                formatted_messages.append({
-                    "role": role,
-                    "content": msg.content
-                })
-            
-            return formatted_messages
+            rows = db.execute(stmt).all()
+
+            # Convert to LangChain message format, reversed into chronological order
+            return [
+                {
+                    "role": "user" if message_type == "user" else "assistant",
+                    "content": content,
+                }
+                for content, message_type in rows[::-1]
+            ]
         except Exception as e:
             print(f"Error loading conversation history: {e}")
             return []
@@ -157,45 +271,69 @@ class Assistant:
         Returns:
             The transcribed text (may be empty string if transcription fails silently).
         """
+        # Shrink the upload off the event loop (decoding/encoding is CPU-bound)
+        audio_bytes, filename = await asyncio.to_thread(_prepare_audio_for_whisper, audio_bytes, filename)
+
         # Wrap bytes in a file-like object with a name attr (required by OpenAI lib)
         audio_file_obj = io.BytesIO(audio_bytes)
         audio_file_obj.name = filename  # type: ignore[attr-defined]
 
         try:
-            model = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-
-            transcription = await model.audio.transcriptions.create(
-                model="whisper-1",
-                file=audio_file_obj,
-                response_format="text",
-            )
+            async with self._stt_sem:
+                transcription = await self._openai.audio.transcriptions.create(
+                    model="whisper-1",
+                    file=audio_file_obj,
+                    response_format="text",
+                )
             return transcription or ""
         except Exception as e:
             # Log and gracefully degrade; upstream can decide fallback behavior
             print(f"[transcribe_audio] Failed to transcribe audio: {e}")
             return ""
 
-    async def generate_response(self, prompt: str, from_number: str, to_number: str) -> str:
-        # Store prompt in DB
-        db = SessionLocal()
-        try:
-            msg_record = Message(
-                _from=from_number,
-                _to=to_number,
-                content=prompt,
-                created_at=date.today().isoformat(),
-                message_type="user"
-            )
-            db.add(msg_record)
-            db.commit()
-        except Exception as e:
-            print(f"Error saving incoming message to DB: {e}")
-        finally:
-            db.close()
-        
-        # Create messages with system instructions, and current prompt
+    def _save_messages(self, records: list[Message]):
+        """Persist message records in a single transaction."""
+        with SessionLocal() as db:
+            try:
+                db.add_all(records)
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                print(f"Error saving messages to DB: {e}")
+
+    def _response_cache_key(self, prompt: str, from_number: str) -> bytes | None:
+        """Build the response cache key, or None if the prompt must not be cached."""
+        normalized = " ".join(prompt.lower().split())
+        if not _CACHEABLE_PROMPT_RE.fullmatch(normalized):
+            return None
+        return hashlib.md5(f"{from_number}|{_today_iso()}|{normalized}".encode("utf-8")).digest()
+
+    def _get_cached_response(self, key: bytes | None) -> str | None:
+        if key is None or key not in self._response_cache:
+            return None
+        cached_at, response = self._response_cache[key]
+        if time.monotonic() - cached_at > _RESPONSE_CACHE_TTL_SECONDS:
+            del self._response_cache[key]
+            return None
+        self._response_cache.move_to_end(key)
+        return response
+
+    def _cache_response(self, key: bytes | None, response: str):
+        if key is None:
+            return
+        self._response_cache[key] = (time.monotonic(), response)
+        self._response_cache.move_to_end(key)
+        if len(self._response_cache) > _RESPONSE_CACHE_MAX_ENTRIES:
+            self._response_cache.popitem(last=False)
+
+    async def _run_graph(self, prompt: str, from_number: str) -> str:
+        """Run the agent graph for a prompt and return the aggregated text response."""
+        # Create messages with system instructions, and current prompt.
+        # The instructions stay a byte-identical first message so OpenAI can serve them from its
+        # prompt cache; the date line changes daily, so it goes in a separate message after it.
         messages = [
-            {"role": "system", "content": self.assistant_instructions + f"\n\nCurrent date is {date.today().isoformat()} and default timezone is UTC -3 (ART)."}
+            {"role": "system", "content": self.assistant_instructions},
+            {"role": "system", "content": f"Current date is {_today_iso()} and default timezone is UTC -3 (ART)."},
         ]
         
         # Add current user message
@@ -204,59 +342,55 @@ class Assistant:
         # Use phone number as thread ID for persistent memory
         config = {"configurable": {"thread_id": from_number}}
 
-        final_response = ""
-        
         print(f"[Assistant] Generating response for prompt: {prompt}")
-        for step in self.graph.stream({"messages": messages}, config, stream_mode="messages"):
-            # step is a tuple (message, metadata) when using stream_mode="messages"
-            if isinstance(step, tuple) and len(step) == 2:
-                message_chunk, metadata = step
-                
-                # Only process AI messages that have content
-                if (hasattr(message_chunk, 'content') and 
-                    message_chunk.content):
-                    
-                    # Handle both string and list content (Responses API can return lists)
-                    content = message_chunk.content
-                    if isinstance(content, list):
-                        # Extract text from list of content blocks
-                        text_content = ""
-                        for item in content:
-                            if isinstance(item, dict) and 'text' in item:
-                                text_content += item['text']
-                            elif isinstance(item, str):
-                                text_content += item
-                            elif hasattr(item, 'text'):
-                                text_content += item.text
-                        content = text_content
-                    
-                    # Filter out JSON responses and empty content
-                    if content and not str(content).startswith('{'):
-                        final_response += content
-                    
-        # Send the complete response via Twilio
-        if final_response:
-            self.twilio_client.messages.create(
-                body=final_response,
-                from_=to_number,
-                to=from_number
+        # Bound concurrent graph runs so message bursts don't fan out into unbounded OpenAI calls
+        async with self._chat_sem:
+            result = await self.graph.ainvoke({"messages": messages}, config)
+
+        # Twilio can't stream partial messages, so only the final AI message matters
+        return _extract_text(result["messages"][-1].content)
+
+    async def generate_response(self, prompt: str, from_number: str, to_number: str) -> str:
+        # The inbound message is always stored, even if generation or sending fails
+        records = [
+            Message(
+                _from=from_number,
+                _to=to_number,
+                content=prompt,
+                message_type="user"
             )
+        ]
+        final_response = ""
+        try:
+            # Serve repeated greetings/thanks from the response cache; everything else hits the graph
+            cache_key = self._response_cache_key(prompt, from_number)
+            cached_response = self._get_cached_response(cache_key)
+            if cached_response is None:
+                final_response = await self._run_graph(prompt, from_number)
+                if final_response:
+                    self._cache_response(cache_key, final_response)
+            else:
+                final_response = cached_response
+                print(f"[Assistant] Response cache hit for prompt: {prompt}")
 
-            # Store AI response in DB
-            db = SessionLocal()
-            try:
-                msg_record = Message(
-                    _from=to_number,
-                    _to=from_number,
-                    content=final_response,
-                    created_at=date.today().isoformat(),
-                    message_type="ai"
+            # Send the complete response via Twilio (blocking HTTP call, so run it in a worker thread)
+            if final_response:
+                await asyncio.to_thread(
+                    self.twilio_client.messages.create,
+                    body=final_response,
+                    from_=to_number,
+                    to=from_number
                 )
-                db.add(msg_record)
-                db.commit()
-            except Exception as e:
-                print(f"Error saving AI response to DB: {e}")
-            finally:
-                db.close()
-            
+                records.append(
+                    Message(
+                        _from=to_number,
+                        _to=from_number,
+                        content=final_response,
+                        message_type="ai"
+                    )
+                )
+        finally:
+            # Store prompt and AI response in DB with one commit, off the event loop
+            await asyncio.to_thread(self._save_messages, records)
+
         return final_response
\ No newline at end of file
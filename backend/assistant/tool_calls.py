@@ -3,6 +3,7 @@ import json
 from langchain_core.messages import ToolMessage
 from langgraph.graph import StateGraph, END
 from assistant.state import State
+from tools.calendar import BATCHABLE_OPERATIONS, execute_batch
 
 class BasicToolNode:
     """A node that runs the tools requested in the last AIMessage."""
@@ -17,11 +18,22 @@ class BasicToolNode:
             message = messages[-1]
         else:
             raise ValueError("No message found in input")
+        tool_calls = message.tool_calls
+
+        # Several calendar calls in the same turn go to Google as one batched HTTP request, but only
+        # when every call in the turn is batchable; mixed turns (e.g. delete then create) must keep
+        # the model's order, so they run sequentially.
+        if len(tool_calls) > 1 and all(tc["name"] in BATCHABLE_OPERATIONS for tc in tool_calls):
+            tool_results = execute_batch([
+                {"name": tc["name"], "args": self._validate_args(tc)} for tc in tool_calls
+            ])
+        else:
+            tool_results = [
+                self.tools_by_name[tc["name"]].invoke(tc["args"]) for tc in tool_calls
+            ]
+
         outputs = []
-        for tool_call in message.tool_calls:
-            tool_result = self.tools_by_name[tool_call["name"]].invoke(
-                tool_call["args"]
-            )
+        for tool_call, tool_result in zip(tool_calls, tool_results):
             outputs.append(
                 ToolMessage(
                     content=json.dumps(tool_result),
@@ -30,6 +42,11 @@ class BasicToolNode:
                 )
             )
         return {"messages": outputs}
+
+    def _validate_args(self, tool_call: dict) -> dict:
+        """Validate tool call args against the tool's schema, as tool.invoke would."""
+        schema = self.tools_by_name[tool_call["name"]].args_schema
+        return schema.model_validate(tool_call["args"]).model_dump()
     
     @staticmethod
     def route_tools(
@@ -1,16 +1,63 @@
+import asyncio
 import os
-import requests
+import httpx
 import warnings
 warnings.filterwarnings('ignore')
 
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from assistant.assistant import Assistant
+from models import dispose_engine
 from dotenv import load_dotenv
 
 load_dotenv(dotenv_path='.env.development')  # Load environment variables from a .env file
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Dedicated pool for blocking work (Twilio sends, DB writes, audio transcoding, sync graph
+    # nodes). Installed as the loop's default executor so asyncio.to_thread and LangGraph's
+    # offloading of sync nodes both use it.
+    executor = ThreadPoolExecutor(
+        max_workers=min(32, 4 * (os.cpu_count() or 1)),
+        thread_name_prefix="assistant-worker",
+    )
+    app.state.executor = executor
+    assistant: Assistant | None = None
+    http: httpx.AsyncClient | None = None
+    try:
+        asyncio.get_running_loop().set_default_executor(executor)
+
+        # Build the assistant once per process so the model, checkpointer and Twilio
+        # client are reused across webhook requests instead of rebuilt per message.
+        assistant = Assistant()
+        app.state.assistant = assistant
+        await assistant.setup()
+        # Shared HTTP client for Twilio media downloads (keeps connections alive between webhooks).
+        # Twilio media URLs redirect to the actual file location, hence follow_redirects.
+        http = httpx.AsyncClient(timeout=30, follow_redirects=True)
+        app.state.http = http
+        yield
+    finally:
+        # Each step is guarded so one failing cleanup (or a failed startup) doesn't skip the rest
+        if http is not None:
+            try:
+                await http.aclose()
+            except Exception as e:
+                print(f"[lifespan] Error closing HTTP client: {e}")
+        if assistant is not None:
+            try:
+                await assistant.close()
+            except Exception as e:
+                print(f"[lifespan] Error closing assistant: {e}")
+        try:
+            dispose_engine()
+        except Exception as e:
+            print(f"[lifespan] Error disposing DB engine: {e}")
+        executor.shutdown(wait=True)
+
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -31,7 +78,7 @@ async def receive_message(request: Request):
         raise HTTPException(status_code=400, detail="Missing From or To fields in webhook payload")
 
     body: str | None = None
-    assistant = Assistant()
+    assistant: Assistant = request.app.state.assistant
 
     # Detect audio media attachment and attempt transcription
     media_content_type = form_data.get("MediaContentType0")
@@ -47,7 +94,7 @@ async def receive_message(request: Request):
             raise HTTPException(status_code=500, detail="Twilio credentials not configured for audio retrieval")
 
         try:
-            resp = requests.get(media_url, auth=(account_sid, auth_token), timeout=30)
+            resp = await request.app.state.http.get(media_url, auth=(account_sid, auth_token))
             resp.raise_for_status()
             audio_bytes = resp.content
             # Derive a filename extension from content-type if possible
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, create_engine
+from sqlalchemy import Column, DateTime, Index, Integer, String, Text, create_engine, func
 from sqlalchemy.engine import URL
 from sqlalchemy.orm import declarative_base, sessionmaker
 from dotenv import load_dotenv
@@ -22,10 +22,24 @@ url = URL.create(
 )
 
 # Ensure UTF-8 client encoding for psycopg2. Useful for spanish characters on Windows.
-engine = create_engine(url, connect_args={"options": "-c client_encoding=UTF8"}, pool_pre_ping=True)
+# The engine (and its QueuePool) is created once at import time and shared by every
+# SessionLocal(); sizing/recycling keeps bursty webhook traffic off fresh connects.
+engine = create_engine(
+    url,
+    connect_args={"options": "-c client_encoding=UTF8"},
+    pool_pre_ping=True,
+    pool_size=10,
+    max_overflow=20,
+    pool_recycle=1800,
+    pool_use_lifo=True,
+)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+def dispose_engine():
+    """Close all pooled connections. Called on application shutdown."""
+    engine.dispose()
+
 class Message(Base):
     __tablename__ = "messages"
 
@@ -33,9 +47,14 @@ class Message(Base):
     _from = Column(String(50), nullable=False)
     _to = Column(String(50), nullable=False)
     content = Column(Text, nullable=False)
-    created_at = Column(String(50), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
     message_type = Column(String(20), nullable=False)
 
+    # Backs the per-conversation history lookup (both directions, newest first by id).
+    __table_args__ = (
+        Index("ix_messages_from_to_id", "_from", "_to", "id"),
+    )
+
 try:
     Base.metadata.create_all(bind=engine)
 except UnicodeDecodeError as e:
@@ -28,10 +28,12 @@ Note: The first run will require an interactive OAuth consent in a browser. The
 from __future__ import annotations
 
 from dataclasses import dataclass
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from typing import List, Optional, Sequence
 
+import json
 import os
+import threading
 
 from dotenv import load_dotenv
 
@@ -39,7 +41,8 @@ from dotenv import load_dotenv
 from google.oauth2.credentials import Credentials
 from google.auth.transport.requests import Request
 from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
+from googleapiclient.discovery import Resource, build_from_document
+from googleapiclient.discovery_cache import get_static_doc
 from googleapiclient.errors import HttpError
 
 
@@ -119,6 +122,38 @@ def _load_credentials() -> Credentials:
 	return creds
 
 
+# Credentials are shared process-wide; Resource objects are cached per thread because the
+# underlying httplib2 transport is not thread-safe (tools may run in executor threads).
+_CREDS_LOCK = threading.Lock()
+_CREDS: Optional[Credentials] = None
+_local = threading.local()
+
+# Calendar v3 discovery document bundled with google-api-python-client (>= 2.0), parsed once per
+# process so building a service never fetches or re-parses it.
+_DISCOVERY_JSON = get_static_doc("calendar", "v3")
+_DISCOVERY_DOC: Optional[dict] = json.loads(_DISCOVERY_JSON) if _DISCOVERY_JSON else None
+
+
+def _get_calendar_service() -> Resource:
+	"""
+	Return a cached Calendar v3 service, reloading credentials only when they are no longer valid.
+	"""
+	global _CREDS
+	with _CREDS_LOCK:
+		if _CREDS is None or not _CREDS.valid:
+			_CREDS = _load_credentials()
+		creds = _CREDS
+
+	service = getattr(_local, "service", None)
+	if service is None or getattr(_local, "creds", None) is not creds:
+		if _DISCOVERY_DOC is None:
+			raise RuntimeError("Bundled Calendar v3 discovery document not found; upgrade google-api-python-client to >= 2.0.")
+		service = build_from_document(_DISCOVERY_DOC, credentials=creds)
+		_local.service = service
+		_local.creds = creds
+	return service
+
+
 def _ensure_rfc3339(dt_str: str) -> datetime:
 	"""
 	Parse ISO 8601 date string to datetime with tzinfo.
@@ -187,6 +222,28 @@ def create_calendar_event(
 
 	Returns: The created event resource (dict) from Google Calendar API.
 	"""
+	ev = _build_event(summary, start, end, description, attendees, location, calendar_id)
+
+	try:
+		service = _get_calendar_service()
+		return _insert_event_request(service, ev).execute()
+	except HttpError as e:
+		# Provide more context
+		raise RuntimeError(f"Google Calendar API error: {e}") from e
+
+
+def _build_event(
+	summary: str,
+	start: str,
+	end: str,
+	description: Optional[str] = None,
+	attendees: Optional[List[str]] = None,
+	location: Optional[str] = None,
+	calendar_id: Optional[str] = None,
+) -> CalendarEvent:
+	"""
+	Validate create_calendar_event arguments and build the CalendarEvent.
+	"""
 	if not summary or not isinstance(summary, str):
 		raise ValueError("summary must be a non-empty string")
 
@@ -195,7 +252,7 @@ def create_calendar_event(
 	if end_dt <= start_dt:
 		raise ValueError("end must be after start")
 
-	ev = CalendarEvent(
+	return CalendarEvent(
 		summary=summary,
 		start=start_dt,
 		end=end_dt,
@@ -205,19 +262,23 @@ def create_calendar_event(
 		calendar_id=(calendar_id or DEFAULT_CALENDAR_ID),
 	)
 
-	creds = _load_credentials()
-	try:
-		service = build("calendar", "v3", credentials=creds, cache_discovery=False)
-		body = _to_event_body(ev)
-		created = service.events().insert(
-			calendarId=ev.calendar_id,
-			body=body,
-			sendUpdates="all",
-		).execute()
-		return created
-	except HttpError as e:
-		# Provide more context
-		raise RuntimeError(f"Google Calendar API error: {e}") from e
+
+def _insert_event_request(service: Resource, ev: CalendarEvent):
+	return service.events().insert(
+		calendarId=ev.calendar_id,
+		body=_to_event_body(ev),
+		sendUpdates="all",
+	)
+
+
+def _list_events_request(service: Resource, time_min: str, time_max: str, calendar_id: Optional[str] = None):
+	return service.events().list(
+		calendarId=calendar_id or DEFAULT_CALENDAR_ID,
+		timeMin=time_min,
+		timeMax=time_max,
+		singleEvents=True,
+		orderBy="startTime",
+	)
 
 def get_calendar_events(time_min: str, time_max: str, calendar_id: Optional[str] = None) -> List[dict]:
     """
@@ -230,16 +291,9 @@ def get_calendar_events(time_min: str, time_max: str, calendar_id: Optional[str]
 
     Returns: A list of event resources (dict) from Google Calendar API.
     """
-    creds = _load_credentials()
     try:
-        service = build("calendar", "v3", credentials=creds, cache_discovery=False)
-        events = service.events().list(
-            calendarId=calendar_id or DEFAULT_CALENDAR_ID,
-            timeMin=time_min,
-            timeMax=time_max,
-            singleEvents=True,
-            orderBy="startTime",
-        ).execute()
+        service = _get_calendar_service()
+        events = _list_events_request(service, time_min, time_max, calendar_id).execute()
         return events.get("items", [])
     except HttpError as e:
         # Provide more context
@@ -255,19 +309,29 @@ def delete_calendar_event(start_time: str, calendar_id: Optional[str] = None) ->
 	
     Returns: None
     """
-    creds = _load_credentials()
+    start_dt = _ensure_rfc3339(start_time)
     try:
-        service = build("calendar", "v3", credentials=creds, cache_discovery=False)
+        service = _get_calendar_service()
+        # timeMin/timeMax match events overlapping [start, start + 1min), which includes all-day
+        # and in-progress events, so fetch only id/start and pick the one that starts exactly there.
         events = service.events().list(
             calendarId=calendar_id or DEFAULT_CALENDAR_ID,
-            timeMin=start_time,
+            timeMin=start_dt.isoformat(),
+            timeMax=(start_dt + timedelta(minutes=1)).isoformat(),
             singleEvents=True,
             orderBy="startTime",
+            fields="items(id,start)",
         ).execute()
-        items = events.get("items", [])
-        if not items:
+        event_id = next(
+            (
+                item["id"] for item in events.get("items", [])
+                if "dateTime" in item.get("start", {})
+                and _ensure_rfc3339(item["start"]["dateTime"]) == start_dt
+            ),
+            None,
+        )
+        if event_id is None:
             raise ValueError("No event found with the specified start time.")
-        event_id = items[0]['id']
         service.events().delete(
             calendarId=calendar_id or DEFAULT_CALENDAR_ID,
             eventId=event_id
@@ -276,10 +340,65 @@ def delete_calendar_event(start_time: str, calendar_id: Optional[str] = None) ->
         # Provide more context
         raise RuntimeError(f"Google Calendar API error: {e}") from e
 
+# Operations that execute_batch can combine into a single HTTP round-trip
+BATCHABLE_OPERATIONS = frozenset({"create_calendar_event", "get_calendar_events"})
+
+def execute_batch(ops: List[dict]) -> List[dict]:
+    """
+    Run several calendar operations in a single batched HTTP request.
+
+    Args:
+        ops: List of {"name": <operation>, "args": {...}} where operation is one of
+            BATCHABLE_OPERATIONS and args are that function's keyword arguments.
+
+    Returns: One result per op, in order, with the same value the single call returns.
+
+    Raises the same errors as the single calls: ValueError for invalid arguments (before anything
+    is sent) and RuntimeError if any sub-request fails.
+    """
+    service = _get_calendar_service()
+
+    # Build (and validate) every request first so bad input fails before anything is sent
+    pending = []
+    for op in ops:
+        name, args = op["name"], op.get("args", {})
+        if name == "create_calendar_event":
+            pending.append(_insert_event_request(service, _build_event(**args)))
+        elif name == "get_calendar_events":
+            pending.append(_list_events_request(service, **args))
+        else:
+            raise ValueError(f"Operation not batchable: {name}")
+
+    results: List = [None] * len(ops)
+    errors: List[Exception] = []
+
+    def callback(request_id: str, response, exception):
+        idx = int(request_id)
+        if exception is not None:
+            errors.append(exception)
+        elif ops[idx]["name"] == "get_calendar_events":
+            results[idx] = response.get("items", [])
+        else:
+            results[idx] = response
+
+    batch = service.new_batch_http_request(callback=callback)
+    for idx, request in enumerate(pending):
+        batch.add(request, request_id=str(idx))
+
+    try:
+        batch.execute()
+    except HttpError as e:
+        raise RuntimeError(f"Google Calendar API error: {e}") from e
+    if errors:
+        raise RuntimeError(f"Google Calendar API error: {errors[0]}") from errors[0]
+    return results
+
 __all__ = [
 	"CalendarEvent",
 	"create_calendar_event",
 	"get_calendar_events",
 	"delete_calendar_event",
+	"execute_batch",
+	"BATCHABLE_OPERATIONS",
 ]
 